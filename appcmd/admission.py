@@ -0,0 +1,175 @@
+"""Admission control and rate limiting.
+
+Requests are rate limited per system and route by token buckets,
+which are keyed by the system's VPN source IP address, so that no
+database query is necessary to reject a request.
+Additionally, the amount of concurrent requests per database backend
+is capped across all workers, so that overload results in fast rejections
+instead of piling up connections. Slots expire after a timeout, so that
+slots of killed workers do not leak.
+"""
+
+from math import ceil
+from time import monotonic, sleep, time
+from typing import Iterable, Optional
+from uuid import uuid4
+
+from flask import g, request
+
+from appcmd.cache import SharedCache
+from appcmd.config import get_config
+
+
+__all__ = ["admit", "release"]
+
+
+DEFAULT_LIMIT = (2.0, 20)
+ROUTE_LIMITS = {
+    ("GET", "/deployment"): (0.2, 5),
+    ("POST", "/poll"): (0.2, 5),
+    ("POST", "/statistics"): (0.5, 10),
+}
+DEFAULT_BACKENDS = ("hwdb",)
+BACKENDS = {
+    "/bookables": ("hwdb", "bookings"),
+    "/bookables/<int:ident>/availability": ("hwdb", "bookings"),
+    "/bookings": ("hwdb", "bookings"),
+    "/bookings/<int:ident>": ("hwdb", "bookings"),
+    "/cleaning": ("hwdb", "cleaninglog"),
+    "/damagereport": ("hwdb", "damage_report"),
+    "/online-check": (),
+    "/poll": ("cmslib",),
+    "/proxy": ("digsigdb",),
+    "/statistics": ("hwdb", "digsigdb"),
+    "/tenant2landlord": ("hwdb", "tenant2landlord"),
+    "/tenant2tenant": ("hwdb", "tenant2tenant"),
+    "/tenantcalendar": ("hwdb", "tenantcalendar"),
+}
+BUCKETS = SharedCache("appcmd-ratelimit", ttl=3600, maxsize=65536)
+SLOTS = SharedCache("appcmd-concurrency", ttl=60, maxsize=256)
+POLL_INTERVAL = 0.02
+
+
+def get_limit(method: str, rule: str) -> tuple[float, int]:
+    """Returns the rate in tokens per second and the burst size for a route."""
+
+    rate, burst = ROUTE_LIMITS.get((method, rule), DEFAULT_LIMIT)
+    config = get_config()
+    return (
+        config.getfloat("RateLimit", f"{method} {rule} rate", fallback=rate),
+        config.getint("RateLimit", f"{method} {rule} burst", fallback=burst),
+    )
+
+
+def get_cap(backend: str) -> int:
+    """Returns the maximum amount of concurrent requests to a backend."""
+
+    return get_config().getint("Concurrency", backend, fallback=32)
+
+
+def get_timeout() -> float:
+    """Returns the timeout to wait for a free backend slot."""
+
+    return get_config().getfloat("Concurrency", "timeout", fallback=0.5)
+
+
+def get_slot_timeout() -> float:
+    """Returns the seconds after which an unreleased slot expires.
+
+    This should match the request timeout, e.g. uWSGI's harakiri.
+    """
+
+    return get_config().getfloat("Concurrency", "slot_timeout", fallback=60)
+
+
+def consume(key: str, rate: float, burst: int) -> float:
+    """Consumes a token from the respective bucket.
+
+    Returns the seconds until a token
+    is available if the bucket is empty.
+    """
+
+    with BUCKETS.locked():
+        now = time()
+        tokens, timestamp = BUCKETS.get(key, (burst, now))
+        tokens = min(burst, tokens + (now - timestamp) * rate)
+
+        if tokens < 1:
+            return (1 - tokens) / rate
+
+        BUCKETS.set(key, (tokens - 1, now), ttl=ceil(burst / rate))
+        return 0
+
+
+def try_acquire(backend: str, token: str) -> bool:
+    """Tries to acquire a slot for the backend."""
+
+    with SLOTS.locked():
+        now = time()
+        slots = {
+            holder: expires
+            for holder, expires in SLOTS.get(backend, {}).items()
+            if expires > now
+        }
+
+        if acquired := len(slots) < get_cap(backend):
+            slots[token] = now + get_slot_timeout()
+
+        SLOTS.set(backend, slots, ttl=get_slot_timeout())
+        return acquired
+
+
+def release_slot(backend: str, token: str) -> None:
+    """Releases the slot of the backend."""
+
+    with SLOTS.locked():
+        slots = SLOTS.get(backend, {})
+        slots.pop(token, None)
+        SLOTS.set(backend, slots, ttl=get_slot_timeout())
+
+
+def acquire(backends: Iterable[str]) -> bool:
+    """Acquires slots for the given backends."""
+
+    g.slot_token = token = uuid4().hex
+    g.backends = []
+    deadline = monotonic() + get_timeout()
+
+    for backend in sorted(backends):
+        while not try_acquire(backend, token):
+            if monotonic() >= deadline:
+                release()
+                return False
+
+            sleep(POLL_INTERVAL)
+
+        g.backends.append(backend)
+
+    return True
+
+
+def admit() -> Optional[tuple[str, int, dict[str, str]]]:
+    """Rejects requests exceeding the rate or concurrency limits."""
+
+    if request.method == "OPTIONS" or (rule := request.url_rule) is None:
+        return None
+
+    rate, burst = get_limit(request.method, rule.rule)
+    key = f"{request.remote_addr}:{request.method}:{rule.rule}"
+
+    if (delay := consume(key, rate, burst)) > 0:
+        return "Too many requests.", 429, {"Retry-After": str(ceil(delay))}
+
+    if not acquire(BACKENDS.get(rule.rule, DEFAULT_BACKENDS)):
+        return "Service overloaded.", 503, {"Retry-After": "1"}
+
+    return None
+
+
+def release(_: Optional[BaseException] = None) -> None:
+    """Releases the backend slots acquired by the current request."""
+
+    token = g.pop("slot_token", None)
+
+    for backend in g.pop("backends", ()):
+        release_slot(backend, token)
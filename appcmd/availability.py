@@ -0,0 +1,188 @@
+"""Per-bookable interval index of upcoming bookings.
+
+Each worker keeps its own indexes. A generation counter per bookable, shared
+across workers, is bumped on every booking and cancellation, so that workers
+reload indexes that other workers' changes outdated.
+"""
+
+from bisect import bisect_left, insort
+from dataclasses import dataclass, field
+from datetime import datetime
+from itertools import islice
+from threading import Lock
+from typing import Iterator
+
+from bookings import Bookable, Booking
+
+from appcmd.cache import SharedCache, TTLCache
+
+
+__all__ = [
+    "Interval",
+    "BookingIndex",
+    "get_index",
+    "add_booking",
+    "remove_booking",
+    "invalidate_index",
+]
+
+
+INDEXES = TTLCache(ttl=30, maxsize=4096)
+# Must outlive the indexes, lest an expired generation matches an old index.
+GENERATIONS = SharedCache("appcmd-bookings", ttl=3600, maxsize=4096)
+
+
+@dataclass(frozen=True, order=True)
+class Interval:
+    """A booked interval."""
+
+    start: datetime
+    end: datetime
+    booking: int = field(default=0, compare=False)
+
+    def to_json(self) -> dict[str, str]:
+        """Returns a JSON-ish dict."""
+        return {"start": self.start.isoformat(), "end": self.end.isoformat()}
+
+
+@dataclass
+class BookingIndex:
+    """Upcoming bookings of a bookable sorted by their start.
+
+    The list of intervals is replaced rather than modified on
+    changes, so that readers can use it without locking.
+    """
+
+    intervals: list[Interval]
+    lock: Lock = field(default_factory=Lock)
+    generation: int = 0
+
+    @classmethod
+    def load(cls, bookable: Bookable, generation: int = 0) -> "BookingIndex":
+        """Loads the upcoming bookings of the given bookable."""
+        return cls(
+            sorted(
+                Interval(booking.start, booking.end, booking.id)
+                for booking in Booking.select(
+                    Booking.id, Booking.start, Booking.end
+                ).where(
+                    (Booking.bookable == bookable) & (Booking.end >= datetime.now())
+                )
+            ),
+            generation=generation,
+        )
+
+    def overlapping(self, start: datetime, end: datetime) -> Iterator[Interval]:
+        """Yields intervals overlapping the given time range.
+
+        Since bookings of a bookable do not overlap one another, at most the
+        booking starting right before the range can reach into it.
+        """
+        intervals = self.intervals
+        index = max(0, bisect_left(intervals, Interval(start, start)) - 1)
+
+        for interval in islice(intervals, index, None):
+            if interval.start >= end:
+                return
+
+            if interval.end > start:
+                yield interval
+
+    def conflicts(self, start: datetime, end: datetime) -> bool:
+        """Checks whether the given time range is already booked."""
+        return any(True for _ in self.overlapping(start, end))
+
+    def free(self, start: datetime, end: datetime) -> Iterator[Interval]:
+        """Yields the free intervals within the given time range."""
+        for interval in self.overlapping(start, end):
+            if interval.start > start:
+                yield Interval(start, interval.start)
+
+            start = max(start, interval.end)
+
+        if start < end:
+            yield Interval(start, end)
+
+    def add(self, booking: Booking, generation: int) -> None:
+        """Adds a booking."""
+        with self.lock:
+            intervals = self.intervals[:]
+            insort(intervals, Interval(booking.start, booking.end, booking.id))
+            self.intervals = intervals
+            self.generation = generation
+
+    def remove(self, booking: Booking, generation: int) -> None:
+        """Removes a booking."""
+        with self.lock:
+            self.intervals = [
+                interval
+                for interval in self.intervals
+                if interval.booking != booking.id
+            ]
+            self.generation = generation
+
+
+def get_generation(bookable: Bookable) -> int:
+    """Returns the current generation of the bookable's bookings."""
+
+    return GENERATIONS.get(str(bookable.id), 0)
+
+
+def bump_generation(bookable: Bookable) -> int:
+    """Increments the generation of the bookable's bookings.
+
+    Returns the previous generation. The caller must hold the cache lock.
+    """
+
+    GENERATIONS.set(str(bookable.id), (generation := get_generation(bookable)) + 1)
+    return generation
+
+
+def get_index(bookable: Bookable, *, refresh: bool = False) -> BookingIndex:
+    """Returns the booking index of the given bookable.
+
+    The index is reloaded if it is outdated by another worker's changes.
+    """
+
+    generation = get_generation(bookable)
+
+    if (
+        refresh
+        or (index := INDEXES.get(bookable.id)) is None
+        or index.generation != generation
+    ):
+        INDEXES.set(bookable.id, index := BookingIndex.load(bookable, generation))
+
+    return index
+
+
+def add_booking(bookable: Bookable, booking: Booking) -> None:
+    """Adds a booking to the bookable's index, if it is loaded and current,
+    and outdates the indexes of the other workers.
+    """
+
+    with GENERATIONS.locked():
+        generation = bump_generation(bookable)
+        index = INDEXES.get(bookable.id)
+
+        if index is not None and index.generation == generation:
+            index.add(booking, generation + 1)
+
+
+def remove_booking(bookable: Bookable, booking: Booking) -> None:
+    """Removes a booking from the bookable's index, if it is loaded and
+    current, and outdates the indexes of the other workers.
+    """
+
+    with GENERATIONS.locked():
+        generation = bump_generation(bookable)
+        index = INDEXES.get(bookable.id)
+
+        if index is not None and index.generation == generation:
+            index.remove(booking, generation + 1)
+
+
+def invalidate_index(bookable: Bookable) -> None:
+    """Invalidates the booking index of the given bookable."""
+
+    INDEXES.pop(bookable.id)
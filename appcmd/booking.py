@@ -1,8 +1,10 @@
 """Renting."""
 
-from datetime import datetime
+from datetime import datetime, timedelta
 from typing import Union
 
+from flask import Response, request
+
 from bookings import dom
 from bookings import email
 from bookings import AlreadyBooked
@@ -12,12 +14,19 @@ from bookings import DurationTooShort
 from bookings import Bookable
 from bookings import Booking
 from mdb import Company, Customer
-from wsgilib import Error, OK, XML
+from wsgilib import Error, JSON, OK
+
+from appcmd.availability import add_booking, get_index, invalidate_index
+from appcmd.availability import remove_booking
+from appcmd.functions import get_json, get_customer, parse_datetime
+from appcmd.xmlstream import stream_xml
 
-from appcmd.functions import get_json, get_customer
 
+__all__ = ["list_bookables", "list_bookings", "availability", "book", "cancel"]
 
-__all__ = ["list_bookables", "list_bookings", "book", "cancel"]
+
+DEFAULT_RANGE = timedelta(days=7)
+MAX_RANGE = timedelta(days=366)
 
 
 def get_booking(ident: int) -> Booking:
@@ -61,11 +70,36 @@ def get_bookable(ident: int) -> Bookable:
         raise Error("No such bookable.", status=404) from None
 
 
+def get_datetime(key: str, default: datetime) -> datetime:
+    """Returns the datetime of the respective query parameter."""
+
+    try:
+        return parse_datetime(request.args[key])
+    except KeyError:
+        return default
+    except ValueError:
+        raise Error("Datetime must be in ISO format.") from None
+
+
+def check_availability(bookable: Bookable, start: datetime, end: datetime) -> None:
+    """Rejects bookings that overlap existing bookings.
+
+    The index is reloaded before rejecting, since
+    it may be outdated by other workers' changes.
+    """
+
+    if not get_index(bookable).conflicts(start, end):
+        return
+
+    if get_index(bookable, refresh=True).conflicts(start, end):
+        raise Error("Bookable has already been booked.", status=409)
+
+
 def make_booking(bookable: Bookable, json: dict) -> Booking:
     """Adds a booking."""
 
     try:
-        start = datetime.fromisoformat(json["start"])
+        start = parse_datetime(json["start"])
     except KeyError:
         raise Error("No start datetime specified.") from None
     except ValueError:
@@ -74,7 +108,7 @@ def make_booking(bookable: Bookable, json: dict) -> Booking:
         start = None
 
     try:
-        end = datetime.fromisoformat(json["end"])
+        end = parse_datetime(json["end"])
     except KeyError:
         raise Error("No end datetime specified.") from None
     except ValueError:
@@ -85,8 +119,11 @@ def make_booking(bookable: Bookable, json: dict) -> Booking:
     rentee = json.get("rentee") or None
     purpose = json.get("purpose") or None
 
+    if start is not None and end is not None and start < end:
+        check_availability(bookable, start, end)
+
     try:
-        return bookable.book(start, end, rentee=rentee, purpose=purpose)
+        booking = bookable.book(start, end, rentee=rentee, purpose=purpose)
     except EndBeforeStart:
         raise Error("Start date must be before end date.") from None
     except DurationTooLong:
@@ -94,10 +131,14 @@ def make_booking(bookable: Bookable, json: dict) -> Booking:
     except DurationTooShort:
         raise Error("Rent duration is too short.") from None
     except AlreadyBooked:
+        invalidate_index(bookable)
         raise Error("Bookable has already been booked.", status=409) from None
 
+    add_booking(bookable, booking)
+    return booking
+
 
-def list_bookables() -> XML:
+def list_bookables() -> Response:
     """Lists available bookables."""
 
     bookables = (
@@ -106,15 +147,10 @@ def list_bookables() -> XML:
         .join(Company)
         .where(Bookable.customer == get_customer())
     )
-    xml = dom.bookables()
+    return stream_xml(dom.bookables, "bookable", bookables.iterator())
 
-    for bookable in bookables:
-        xml.bookable.append(bookable.to_dom())
 
-    return XML(xml)
-
-
-def list_bookings() -> XML:
+def list_bookings() -> Response:
     """Lists stored bookings."""
 
     condition = Bookable.customer == get_customer()
@@ -126,12 +162,40 @@ def list_bookings() -> XML:
         .join(Company)
         .where(condition)
     )
-    xml = dom.bookings()
+    return stream_xml(
+        dom.bookings, "booking", bookings.order_by(Booking.start).iterator()
+    )
 
-    for booking in bookings.order_by(Booking.start):
-        xml.booking.append(booking.to_dom())
 
-    return XML(xml)
+def availability(ident: int) -> JSON:
+    """Lists busy and free intervals of a bookable.
+
+    The time range defaults to the next seven days
+    and does not reach into the past.
+    """
+
+    bookable = get_bookable(ident)
+    start = max(get_datetime("start", now := datetime.now()), now)
+    end = get_datetime("end", start + DEFAULT_RANGE)
+
+    if end <= start:
+        raise Error("Start date must be before end date.")
+
+    if end - start > MAX_RANGE:
+        raise Error("Time range is too long.")
+
+    index = get_index(bookable)
+    return JSON(
+        {
+            "bookable": bookable.id,
+            "start": start.isoformat(),
+            "end": end.isoformat(),
+            "busy": [
+                interval.to_json() for interval in index.overlapping(start, end)
+            ],
+            "free": [interval.to_json() for interval in index.free(start, end)],
+        }
+    )
 
 
 def book() -> Union[Error, OK]:
@@ -152,5 +216,7 @@ def book() -> Union[Error, OK]:
 def cancel(ident: int) -> OK:
     """Cancels a booking."""
 
-    get_booking(ident).delete_instance()
+    booking = get_booking(ident)
+    booking.delete_instance()
+    remove_booking(booking.bookable, booking)
     return OK("Booking cancelled.")
@@ -0,0 +1,164 @@
+"""Caching primitives."""
+
+from collections import OrderedDict
+from contextlib import contextmanager
+from pickle import dumps, loads
+from threading import RLock
+from time import monotonic
+from typing import Any, Hashable, Iterator, Optional
+
+from appcmd.logger import LOGGER
+
+try:
+    import uwsgi
+except ImportError:
+    uwsgi = None
+
+
+__all__ = ["TTLCache", "SharedCache", "check_shared_caches"]
+
+
+SHARED_CACHES = []
+
+
+class TTLCache:
+    """A bounded, thread-safe LRU cache with expiring entries."""
+
+    def __init__(self, ttl: float, maxsize: int = 1024):
+        """Sets the default time to live and the maximum size."""
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self.lock = RLock()
+        self._entries = OrderedDict()
+
+    def __len__(self) -> int:
+        """Returns the amount of stored entries."""
+        return len(self._entries)
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Returns the respective value if it has not yet expired."""
+        with self.lock:
+            try:
+                expires, value = self._entries[key]
+            except KeyError:
+                return default
+
+            if expires <= monotonic():
+                del self._entries[key]
+                return default
+
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        """Stores a value, evicting the least recently used entries."""
+        ttl = self.ttl if ttl is None else ttl
+
+        with self.lock:
+            self._entries[key] = (monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        """Removes an entry and returns its value."""
+        with self.lock:
+            try:
+                expires, value = self._entries.pop(key)
+            except KeyError:
+                return default
+
+            return default if expires <= monotonic() else value
+
+    def clear(self) -> None:
+        """Removes all entries."""
+        with self.lock:
+            self._entries.clear()
+
+
+class SharedCache:
+    """A cache shared across uWSGI workers.
+
+    Uses the uWSGI cache of the given name if it has been configured via
+    the "cache2" option and falls back to a process-local TTLCache otherwise.
+    Values are pickled and must thus be picklable.
+    """
+
+    def __init__(self, name: str, ttl: float, maxsize: int = 1024):
+        """Sets the cache name, default time to live and fallback size."""
+        self.name = name
+        self.ttl = ttl
+        self.local = TTLCache(ttl, maxsize)
+        self.shared = uwsgi_cache_exists(name)
+        SHARED_CACHES.append(self)
+
+    @contextmanager
+    def locked(self) -> Iterator[None]:
+        """Locks the cache across all workers."""
+        if not self.shared:
+            with self.local.lock:
+                yield
+
+            return
+
+        uwsgi.lock()
+
+        try:
+            yield
+        finally:
+            uwsgi.unlock()
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """Returns the respective value."""
+        if not self.shared:
+            return self.local.get(key, default)
+
+        if (value := uwsgi.cache_get(key, self.name)) is None:
+            return default
+
+        return loads(value)
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        """Stores a value."""
+        if not self.shared:
+            return self.local.set(key, value, ttl)
+
+        ttl = self.ttl if ttl is None else ttl
+        uwsgi.cache_update(key, dumps(value), max(1, round(ttl)), self.name)
+        return None
+
+    def pop(self, key: str, default: Any = None) -> Any:
+        """Removes an entry and returns its value."""
+        if not self.shared:
+            return self.local.pop(key, default)
+
+        value = self.get(key, default)
+        uwsgi.cache_del(key, self.name)
+        return value
+
+
+def uwsgi_cache_exists(name: str) -> bool:
+    """Checks whether a uWSGI cache of the given name has been configured."""
+
+    if uwsgi is None:
+        return False
+
+    if isinstance(options := uwsgi.opt.get("cache2", []), bytes):
+        options = [options]
+
+    return any(
+        f"name={name}".encode() in option.split(b",") for option in options
+    )
+
+
+def check_shared_caches() -> None:
+    """Warns about shared caches that fall back to process-local caches."""
+
+    for cache in SHARED_CACHES:
+        if not cache.shared:
+            LOGGER.warning(
+                'uWSGI cache "%s" is not configured. '
+                "Falling back to a cache local to this worker.",
+                cache.name,
+            )
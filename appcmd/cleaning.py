@@ -1,16 +1,94 @@
 """Cleaning submission and retrieval."""
 
-from typing import Union
+from dataclasses import dataclass
+from typing import Iterable, Optional, Union
 
 from flask import request
+from peewee import fn
 
 from cleaninglog import by_deployment, CleaningUser, CleaningDate
+from mdb import Customer
 from wsgilib import JSON, XML
 
+from appcmd.cache import TTLCache
 from appcmd.functions import get_json, get_deployment, parse_datetime
 
 
-__all__ = ["list_cleanings", "add_cleaning"]
+__all__ = [
+    "list_cleanings",
+    "add_cleaning",
+    "get_cleaning_user",
+    "get_cleaning_users",
+]
+
+
+PIN_INDEX = TTLCache(ttl=60, maxsize=1024)
+
+
+@dataclass
+class PinIndex:
+    """Cleaning users of a customer indexed by their PINs."""
+
+    users: dict[str, CleaningUser]
+    version: tuple[int, Optional[int]]
+
+    @classmethod
+    def load(cls, customer: Customer, version: tuple[int, Optional[int]]) -> "PinIndex":
+        """Loads the index for the given customer."""
+        return cls(
+            {
+                str(user.pin): user
+                for user in CleaningUser.select().where(
+                    CleaningUser.customer == customer
+                )
+            },
+            version,
+        )
+
+
+def get_version(customer: Customer) -> tuple[int, Optional[int]]:
+    """Returns the amount and the highest ID of the customer's cleaning users.
+
+    This changes whenever users are added or deleted, since IDs are not reused.
+    """
+
+    return (
+        CleaningUser.select(fn.COUNT(CleaningUser.id), fn.MAX(CleaningUser.id))
+        .where(CleaningUser.customer == customer)
+        .tuples()
+        .get()
+    )
+
+
+def get_pin_index(customer: Customer) -> PinIndex:
+    """Returns the PIN index of the given customer.
+
+    The index is reloaded if users have been added or deleted since it was
+    loaded. Changed PINs of existing users take effect after at most the
+    time to live of PIN_INDEX.
+    """
+
+    version = get_version(customer)
+
+    if (index := PIN_INDEX.get(customer.id)) is None or index.version != version:
+        PIN_INDEX.set(customer.id, index := PinIndex.load(customer, version))
+
+    return index
+
+
+def get_cleaning_users(
+    customer: Customer, pins: Iterable[str]
+) -> dict[str, CleaningUser]:
+    """Returns the cleaning users of the given customer by their PINs."""
+
+    users = get_pin_index(customer).users
+    return {pin: users[pin] for pin in {str(pin) for pin in pins} & users.keys()}
+
+
+def get_cleaning_user(customer: Customer, pin: str) -> Optional[CleaningUser]:
+    """Returns the cleaning user of the given customer by its PIN."""
+
+    return get_cleaning_users(customer, [pin]).get(str(pin))
 
 
 def list_cleanings() -> Union[JSON, XML]:
@@ -24,12 +102,7 @@ def add_cleaning() -> tuple[str, int]:
 
     deployment = get_deployment()
 
-    try:
-        user = CleaningUser.get(
-            (CleaningUser.pin == request.args["pin"])
-            & (CleaningUser.customer == deployment.customer)
-        )
-    except CleaningUser.DoesNotExist:
+    if (user := get_cleaning_user(deployment.customer, request.args["pin"])) is None:
         return "Invalid PIN.", 403
 
     try:
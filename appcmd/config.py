@@ -5,7 +5,14 @@ from functools import cache, partial
 from configlib import load_config
 
 
-__all__ = ["get_config"]
+__all__ = ["get_config", "get_max_msg_size"]
 
 
 get_config = partial(cache(load_config), "appcmd.conf")
+
+
+@cache
+def get_max_msg_size(section: str) -> int:
+    """Returns the maximum message size of the respective section."""
+
+    return get_config().getint(section, "max_msg_size", fallback=2048)
@@ -8,9 +8,9 @@ from ipaddress import IPv4Network
 from ipaddress import IPv6Network
 from ipaddress import ip_address
 from json import loads
-from typing import Union
+from typing import Optional, Union
 
-from flask import request
+from flask import g, request
 
 from hwdb import Deployment, OpenVPN, System
 from mdb import Address
@@ -18,6 +18,7 @@ from wsgilib import Error
 
 
 __all__ = [
+    "get_data",
     "get_json",
     "get_system",
     "get_deployment",
@@ -54,6 +55,22 @@ def get_json() -> Union[dict, list]:
     return loads(request.get_data(as_text=True))
 
 
+def get_data(max_size: int) -> Optional[bytes]:
+    """Returns POSTed data unless it exceeds max_size bytes.
+
+    Oversized bodies are rejected by their Content-Length
+    or read only up to the limit, but never buffered in full.
+    """
+
+    if (length := request.content_length) is not None:
+        return None if length > max_size else request.get_data()
+
+    if len(data := request.stream.read(max_size + 1)) > max_size:
+        return None
+
+    return data
+
+
 def get_system_by_ip() -> System:
     """Returns the system by its source IP address."""
 
@@ -89,12 +106,20 @@ def get_system_by_args() -> System:
 
 
 def get_system() -> System:
-    """Returns the respective system."""
+    """Returns the respective system.
+
+    The system is looked up once per request.
+    """
+
+    if (system := g.get("system")) is not None:
+        return system
 
     with suppress(System.DoesNotExist):
-        return get_system_by_ip()
+        g.system = get_system_by_ip()
+        return g.system
 
-    return get_system_by_args()
+    g.system = get_system_by_args()
+    return g.system
 
 
 def get_deployment() -> Deployment:
@@ -127,14 +152,20 @@ def get_lpt_address() -> Address:
 
 
 def parse_datetime(string: str) -> datetime:
-    """Parse a datetime."""
+    """Parse a datetime.
+
+    Datetimes with a UTC offset are converted to naive local time.
+    """
+
+    try:
+        timestamp = datetime.fromisoformat(string)
+    except ValueError:
+        if not string.endswith("Z"):
+            raise
+
+        timestamp = datetime.fromisoformat(string[:-1]).replace(tzinfo=timezone.utc)
 
-    if string.endswith("Z"):
-        return (
-            datetime.fromisoformat(string[:-1])
-            .replace(tzinfo=timezone.utc)
-            .astimezone(None)
-            .replace(tzinfo=None)
-        )
+    if timestamp.tzinfo is None:
+        return timestamp
 
-    return datetime.fromisoformat(string)
+    return timestamp.astimezone(None).replace(tzinfo=None)
@@ -0,0 +1,125 @@
+"""Idempotent handling of retried POST requests.
+
+Systems on flaky connections retry submissions after timeouts.
+Responses to such requests are stored for a limited time window, keyed by
+the client's "Idempotency-Key" header or, lacking that, a hash of the
+request's content, and replayed to retries without running the handler.
+Responses keyed by content are kept for a shorter time window, since
+identical submissions may also be intended, e.g. booking a slot again
+after cancelling it.
+"""
+
+from hashlib import sha256
+from typing import Optional
+
+from flask import Response, g, request
+
+from appcmd.cache import SharedCache
+from appcmd.config import get_config
+
+
+__all__ = ["replay", "remember"]
+
+
+HEADER = "Idempotency-Key"
+MAX_HASHED_SIZE = 65536
+IDEMPOTENT_ROUTES = {
+    ("POST", "/bookings"),
+    ("POST", "/cleaning"),
+    ("POST", "/damagereport"),
+    ("POST", "/tenant2landlord"),
+    ("POST", "/tenant2tenant"),
+}
+PENDING = "pending"
+RESPONSES = SharedCache("appcmd-idempotency", ttl=600, maxsize=4096)
+
+
+def get_window(hashed: bool = False) -> int:
+    """Returns the time window in seconds in which retries are detected.
+
+    If hashed is True, returns the window for keys hashed from the content.
+    """
+
+    if hashed:
+        return get_config().getint("Idempotency", "content_window", fallback=30)
+
+    return get_config().getint("Idempotency", "window", fallback=600)
+
+
+def get_timeout() -> int:
+    """Returns the seconds after which a request in flight is considered lost.
+
+    This should match the request timeout, e.g. uWSGI's harakiri.
+    """
+
+    return get_config().getint("Idempotency", "timeout", fallback=60)
+
+
+def get_key() -> Optional[tuple[str, int]]:
+    """Returns the idempotency key of the current request
+    and the time window for its response, if applicable.
+    """
+
+    if (rule := request.url_rule) is None:
+        return None
+
+    if (request.method, rule.rule) not in IDEMPOTENT_ROUTES:
+        return None
+
+    if not (key := request.headers.get(HEADER)):
+        if (length := request.content_length) is None or length > MAX_HASHED_SIZE:
+            return None
+
+        content = sha256(request.full_path.encode())
+        content.update(request.get_data())
+        key = content.hexdigest()
+        window = get_window(hashed=True)
+    else:
+        window = get_window()
+
+    return f"{request.remote_addr}:{request.method}:{rule.rule}:{key}", window
+
+
+def replay() -> Optional[Response]:
+    """Returns the stored response if the current request is a retry."""
+
+    if (idempotency := get_key()) is None:
+        return None
+
+    key, _ = idempotency
+
+    with RESPONSES.locked():
+        if (stored := RESPONSES.get(key)) is None:
+            RESPONSES.set(key, PENDING, ttl=get_timeout())
+            g.idempotency = idempotency
+            return None
+
+    if stored == PENDING:
+        return Response(
+            "Request is already being processed.",
+            status=503,
+            headers={"Retry-After": "1"},
+        )
+
+    data, status, content_type = stored
+    return Response(data, status=status, content_type=content_type)
+
+
+def remember(response: Response) -> Response:
+    """Stores the response to the current request for replay on retries."""
+
+    if (idempotency := g.pop("idempotency", None)) is None:
+        return response
+
+    key, window = idempotency
+
+    if response.status_code >= 500 or response.is_streamed:
+        RESPONSES.pop(key)
+        return response
+
+    RESPONSES.set(
+        key,
+        (response.get_data(), response.status_code, response.content_type),
+        ttl=window,
+    )
+    return response
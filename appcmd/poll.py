@@ -54,12 +54,17 @@ def get_poll_and_choices(json: dict) -> tuple[Poll, list[int]]:
 def get_options(poll: Poll, choices: Iterable[int]) -> Iterator[PollOption]:
     """Gets the corresponding poll options for the given choices."""
 
+    options = {
+        option.id: option
+        for option in PollOption.select().where(
+            (PollOption.poll == poll) & (PollOption.id.in_(choices))
+        )
+    }
+
     for choice in choices:
         try:
-            yield PollOption.select().where(
-                (PollOption.poll == poll) & (PollOption.id == choice)
-            ).get()
-        except PollOption.DoesNotExist:
+            yield options[int(choice)]
+        except (KeyError, TypeError, ValueError):
             message = f"Invalid choice {choice} for poll {poll.id}."
             raise Error(message, status=404) from None
 
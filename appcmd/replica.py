@@ -0,0 +1,261 @@
+"""Connection pooling and read replica routing.
+
+If the configuration contains a "Database" section, the databases of all
+models are replaced by routers that use pooled connections to the primary
+database and route queries of GET requests to a read replica, if one is
+configured. If the replica is unreachable, queries fall back to the primary
+for a while. Systems that just wrote data which GET routes read back are
+pinned to the primary, so that they read their own writes despite
+replication lag.
+"""
+
+from pathlib import Path
+from time import monotonic
+from typing import Any, Iterator, Optional
+
+from flask import Response, g, has_request_context, request
+from peewee import Database, DatabaseError, DatabaseProxy, Model
+from peewee import MySQLDatabase, PostgresqlDatabase, SqliteDatabase
+from playhouse.pool import PooledDatabase, PooledMySQLDatabase
+from playhouse.pool import PooledPostgresqlDatabase, PooledSqliteDatabase
+
+from appcmd.cache import SharedCache
+from appcmd.config import get_config
+from appcmd.logger import LOGGER
+
+
+__all__ = ["init_databases", "route_reads", "pin_writes", "close_databases"]
+
+
+SECTION = "Database"
+POOLS = [
+    (MySQLDatabase, PooledMySQLDatabase),
+    (PostgresqlDatabase, PooledPostgresqlDatabase),
+    (SqliteDatabase, PooledSqliteDatabase),
+]
+PINNED = SharedCache("appcmd-primary", ttl=5)
+# Writes of data read back by GET routes.
+PINNING_ROUTES = {
+    ("POST", "/bookings"),
+    ("DELETE", "/bookings/<int:ident>"),
+    ("POST", "/cleaning"),
+}
+ROUTERS = []
+
+
+class Router:
+    """Delegates to the primary or the replica database."""
+
+    def __init__(self, primary: Database, replica: Optional[Database] = None):
+        """Sets the primary and replica databases."""
+        self.primary = primary
+        self.replica = replica
+        self.replica_down_until = 0
+
+    def __getattr__(self, attribute: str) -> Any:
+        """Delegates to the target database."""
+        return getattr(self.target, attribute)
+
+    def __enter__(self) -> Database:
+        """Delegates to the target database."""
+        return self.target.__enter__()
+
+    def __exit__(self, *args) -> Any:
+        """Delegates to the target database."""
+        return self.target.__exit__(*args)
+
+    @property
+    def databases(self) -> Iterator[Database]:
+        """Yields the primary and replica database."""
+        yield self.primary
+
+        if self.replica is not None:
+            yield self.replica
+
+    @property
+    def target(self) -> Database:
+        """Returns the database for the current request."""
+        if self.replica is None or not has_request_context():
+            return self.primary
+
+        if not g.get("read_only") or self.replica_down_until > monotonic():
+            return self.primary
+
+        if self.replica.is_closed():
+            try:
+                self.replica.connect()
+            except DatabaseError as error:
+                LOGGER.warning(
+                    "Replica of %s unavailable: %s", self.primary.database, error
+                )
+                self.replica_down_until = monotonic() + get_fallback_time()
+                return self.primary
+
+        return self.replica
+
+
+def get_fallback_time() -> float:
+    """Returns the seconds to use the primary after a replica failure."""
+
+    return get_config().getfloat(SECTION, "fallback_time", fallback=30)
+
+
+def get_models(base: type = Model) -> Iterator[type]:
+    """Yields all imported models."""
+
+    for model in base.__subclasses__():
+        yield model
+        yield from get_models(model)
+
+
+def get_pool_class(database: Database) -> type:
+    """Returns the pooled database class for the given database.
+
+    The backend-specific pools check the liveness of
+    connections before handing them out again.
+    """
+
+    if isinstance(database, PooledDatabase):
+        return type(database)
+
+    for base, pool in POOLS:
+        if type(database) is base:
+            return pool
+
+        if isinstance(database, base):
+            name = f"Pooled{type(database).__name__}"
+            return type(name, (pool, type(database)), {})
+
+    raise TypeError(f"Cannot pool database of type {type(database)}.")
+
+
+def pooled(
+    database: Database, name: Optional[str] = None, **overrides: Any
+) -> PooledDatabase:
+    """Returns a pooled copy of the database.
+
+    Optionally overrides the database name and connect params.
+    Databases attached to SQLite databases are expected
+    next to the database file of the copy.
+    """
+
+    config = get_config()
+    kwargs = {
+        "max_connections": config.getint(SECTION, "max_connections", fallback=8),
+        "stale_timeout": config.getint(SECTION, "stale_timeout", fallback=300),
+    }
+
+    if isinstance(database, SqliteDatabase):
+        kwargs.update(pragmas=database._pragmas, timeout=database._timeout)
+
+    copy = get_pool_class(database)(
+        name or database.database, **{**database.connect_params, **kwargs, **overrides}
+    )
+
+    if isinstance(database, SqliteDatabase):
+        for schema, filename in database._attached.items():
+            if name is not None:
+                filename = str(Path(name).parent / Path(filename).name)
+
+            copy.attach(filename, schema)
+
+    return copy
+
+
+def get_replica(database: Database) -> Optional[tuple[Optional[str], dict[str, Any]]]:
+    """Returns the database name and connect params of the database's replica.
+
+    The password overrides the key the database's connect params already
+    use, since drivers differ in whether they expect "password" or "passwd".
+    """
+
+    config = get_config()
+    name = config.get(SECTION, "replica_database", fallback=None) or None
+    params = {}
+
+    for option, key in [("replica_host", "host"), ("replica_user", "user")]:
+        if value := config.get(SECTION, option, fallback=None):
+            params[key] = value
+
+    if passwd := config.get(SECTION, "replica_passwd", fallback=None):
+        keys = [key for key in ["password", "passwd"] if key in database.connect_params]
+
+        for key in keys or ["password"]:
+            params[key] = passwd
+
+    if port := config.getint(SECTION, "replica_port", fallback=None):
+        params["port"] = port
+
+    if name is None and not params:
+        return None
+
+    return name, params
+
+
+def init_databases() -> None:
+    """Replaces the models' databases with routers."""
+
+    if ROUTERS or not get_config().has_section(SECTION):
+        return
+
+    routers = {}
+
+    for model in get_models():
+        if isinstance(database := model._meta.database, DatabaseProxy):
+            database = database.obj
+
+        if database is None or isinstance(database, Router):
+            continue
+
+        if (router := routers.get(id(database))) is None:
+            replica = None
+
+            if (replica_config := get_replica(database)) is not None:
+                name, params = replica_config
+                replica = pooled(database, name, **params)
+
+            router = routers[id(database)] = Router(pooled(database), replica)
+
+        model._meta.database = router
+
+    ROUTERS.extend(routers.values())
+
+
+def route_reads() -> None:
+    """Routes the queries of GET requests to the replicas."""
+
+    if not ROUTERS or request.method != "GET":
+        return
+
+    g.read_only = PINNED.get(request.remote_addr) is None
+
+
+def pin_writes(response: Response) -> Response:
+    """Pins systems to the primary databases after successful writes
+    of data that they read back.
+    """
+
+    if not ROUTERS or (rule := request.url_rule) is None:
+        return response
+
+    if (request.method, rule.rule) not in PINNING_ROUTES:
+        return response
+
+    if response.status_code >= 400:
+        return response
+
+    PINNED.set(
+        request.remote_addr,
+        True,
+        ttl=get_config().getfloat(SECTION, "read_your_writes", fallback=5),
+    )
+    return response
+
+
+def close_databases(_: Optional[BaseException] = None) -> None:
+    """Returns the connections of the current thread to the pools."""
+
+    for router in ROUTERS:
+        for database in router.databases:
+            if not database.is_closed():
+                database.close()
@@ -1,14 +1,68 @@
 """Return information about the system and deployment."""
 
-from wsgilib import JSON
+from gzip import compress
+from hashlib import sha256
+from json import dumps
 
+from flask import Response, request
+
+from hwdb import Deployment
+from peewee import Model
+
+from appcmd.cache import TTLCache
 from appcmd.functions import get_deployment
 
 
 __all__ = ["deployment_info"]
 
 
-def deployment_info() -> JSON:
-    """Returns information about the system's deployment."""
+CASCADE = 2
+DEPLOYMENTS = TTLCache(ttl=3600, maxsize=4096)
+
+
+def get_version(record: Model, cascade: int = CASCADE) -> str:
+    """Returns a fingerprint of the record and its already loaded relations.
+
+    This does not issue any queries, since get_deployment()
+    selects the deployment with its cascaded relations.
+    """
+
+    version = sha256(repr(sorted(record.__data__.items())).encode())
+
+    if cascade > 0:
+        for name, related in sorted(record.__rel__.items()):
+            version.update(f"{name}:{get_version(related, cascade - 1)}".encode())
+
+    return version.hexdigest()
+
+
+def serialize(deployment: Deployment) -> tuple[bytes, bytes]:
+    """Returns the plain and gzip compressed JSON of the deployment."""
+
+    json = dumps(deployment.to_json(cascade=CASCADE)).encode()
+    return json, compress(json)
+
+
+def deployment_info() -> Response:
+    """Returns information about the system's deployment.
+
+    The cached JSON is reused as long as the deployment's version matches,
+    so changes take effect without invalidation.
+    """
+
+    deployment = get_deployment()
+    version = get_version(deployment)
+
+    if (cached := DEPLOYMENTS.get(deployment.id)) is None or cached[0] != version:
+        DEPLOYMENTS.set(deployment.id, cached := (version, *serialize(deployment)))
+
+    _, json, compressed = cached
+
+    if "gzip" not in request.accept_encodings:
+        response = Response(json, mimetype="application/json")
+    else:
+        response = Response(compressed, mimetype="application/json")
+        response.headers["Content-Encoding"] = "gzip"
 
-    return JSON(get_deployment().to_json(cascade=2))
+    response.vary.add("Accept-Encoding")
+    return response
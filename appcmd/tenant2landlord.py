@@ -2,12 +2,10 @@
 
 from typing import Optional
 
-from flask import request
-
 from tenant2landlord import email, TenantMessage
 
-from appcmd.config import get_config
-from appcmd.functions import get_deployment
+from appcmd.config import get_max_msg_size
+from appcmd.functions import get_data, get_deployment
 
 
 __all__ = ["tenant2landlord"]
@@ -16,10 +14,13 @@ __all__ = ["tenant2landlord"]
 def tenant2landlord(maxlen: Optional[int] = None) -> tuple[str, int]:
     """Stores tenant-to-landlord info."""
 
-    maxlen = maxlen or get_config().getint(
-        "TenantToLandlord", "max_msg_size", fallback=2048
-    )
-    message = request.get_data().decode()
+    maxlen = maxlen or get_max_msg_size("TenantToLandlord")
+
+    # UTF-8 encodes a character with at most four bytes.
+    if (data := get_data(maxlen * 4)) is None:
+        return (f"Maximum text length of {maxlen} exceeded.", 413)
+
+    message = data.decode()
 
     if len(message) > maxlen:
         return (f"Maximum text length of {maxlen} exceeded.", 413)
@@ -3,26 +3,45 @@
 from datetime import datetime
 from typing import Optional
 
-from flask import request
-
+from mdb import Customer
 from tenant2tenant import email, Configuration, TenantMessage
 
-from appcmd.config import get_config
-from appcmd.functions import get_deployment
+from appcmd.cache import TTLCache
+from appcmd.config import get_max_msg_size
+from appcmd.functions import get_data, get_deployment
+
+
+__all__ = ["tenant2tenant", "get_configuration"]
+
+
+CONFIGURATIONS = TTLCache(ttl=60, maxsize=1024)
 
 
-__all__ = ["tenant2tenant"]
+def get_configuration(customer: Customer) -> Configuration:
+    """Returns the customer's tenant-to-tenant configuration.
+
+    Configurations are changed by other services and thus
+    cached per worker for at most the TTL of CONFIGURATIONS.
+    """
+
+    if (configuration := CONFIGURATIONS.get(customer.id)) is None:
+        configuration = Configuration.for_customer(customer)
+        CONFIGURATIONS.set(customer.id, configuration)
+
+    return configuration
 
 
 def tenant2tenant(maxlen: Optional[int] = None) -> tuple[str, int]:
     """Stores tenant info."""
 
-    maxlen = maxlen or get_config().getint(
-        "TenantToTenant", "max_msg_size", fallback=2048
-    )
+    maxlen = maxlen or get_max_msg_size("TenantToTenant")
+
+    # UTF-8 encodes a character with at most four bytes.
+    if (data := get_data(maxlen * 4)) is None:
+        return "Maximum text length exceeded.", 413
 
     try:
-        message = request.get_data().decode()
+        message = data.decode()
     except UnicodeDecodeError:
         return "Non-UTF-8 text provided. Refusing.", 415
 
@@ -34,7 +53,7 @@ def tenant2tenant(maxlen: Optional[int] = None) -> tuple[str, int]:
 
     deployment = get_deployment()
     record = TenantMessage.from_deployment(deployment, message)
-    configuration = Configuration.for_customer(deployment.customer)
+    configuration = get_configuration(deployment.customer)
 
     if configuration.auto_release:
         record.released = True
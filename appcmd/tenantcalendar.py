@@ -1,20 +1,17 @@
 """Tenant calendar information."""
 
+from flask import Response
+
 from tenantcalendar import events, list_customer_events
-from wsgilib import XML
 
 from appcmd.functions import get_customer
+from appcmd.xmlstream import stream_xml
 
 
 __all__ = ["list_events"]
 
 
-def list_events() -> XML:
+def list_events() -> Response:
     """Lists customer events."""
 
-    dom = events()
-
-    for customer_event in list_customer_events(get_customer()):
-        dom.event.append(customer_event.to_dom())
-
-    return XML(dom)
+    return stream_xml(events, "event", list_customer_events(get_customer()).iterator())
@@ -2,16 +2,21 @@
 
 from wsgilib import Application
 
-from appcmd.booking import list_bookables, list_bookings, book, cancel
+from appcmd.admission import admit, release
+from appcmd.booking import list_bookables, list_bookings, availability
+from appcmd.booking import book, cancel
+from appcmd.cache import check_shared_caches
 from appcmd.cleaning import list_cleanings, add_cleaning
 from appcmd.damage_report import damage_report
 from appcmd.garbage_pickup import garbage_pickup
+from appcmd.idempotency import replay, remember
 from appcmd.logger import init_logger
 from appcmd.lpt import get_departures
 from appcmd.mail import send_contact_mail
 from appcmd.online_check import online_check
 from appcmd.poll import cast_vote
 from appcmd.proxy import proxy
+from appcmd.replica import init_databases, route_reads, pin_writes, close_databases
 from appcmd.statistics import add_statistics
 from appcmd.sysdep import deployment_info
 from appcmd.tenant2landlord import tenant2landlord
@@ -26,6 +31,7 @@ PRIVATE = Application("private", cors=True)
 PUBLIC = Application("public", cors=True)
 PRIVATE_ROUTES = [
     ("GET", "/bookables", list_bookables),
+    ("GET", "/bookables/<int:ident>/availability", availability),
     ("GET", "/bookings", list_bookings),
     ("POST", "/bookings", book),
     ("DELETE", "/bookings/<int:ident>", cancel),
@@ -49,3 +55,18 @@ PRIVATE.add_routes(PRIVATE_ROUTES)
 PUBLIC.add_routes(PUBLIC_ROUTES)
 PRIVATE.before_first_request(init_logger)
 PUBLIC.before_first_request(init_logger)
+PRIVATE.before_first_request(check_shared_caches)
+PUBLIC.before_first_request(check_shared_caches)
+PRIVATE.before_first_request(init_databases)
+PUBLIC.before_first_request(init_databases)
+PRIVATE.before_request(admit)
+PUBLIC.before_request(admit)
+PRIVATE.before_request(replay)
+PRIVATE.before_request(route_reads)
+PUBLIC.before_request(route_reads)
+PRIVATE.after_request(remember)
+PRIVATE.after_request(pin_writes)
+PRIVATE.teardown_request(release)
+PUBLIC.teardown_request(release)
+PRIVATE.teardown_request(close_databases)
+PUBLIC.teardown_request(close_databases)
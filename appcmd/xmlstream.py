@@ -0,0 +1,100 @@
+"""Streaming XML serialization of large lists."""
+
+from typing import Any, Callable, Iterable, Iterator
+from xml.dom.minidom import Element
+
+from flask import Response, stream_with_context
+
+
+__all__ = ["stream_xml"]
+
+
+CHUNK_SIZE = 65536
+ENCODING = "utf-8"
+MIMETYPE = "application/xml"
+SENTINEL = "appcmd-xml-stream-sentinel"
+
+
+def get_namespaces(element: Element) -> dict[str, str]:
+    """Returns the namespace declarations of the element."""
+
+    return {
+        name: value
+        for name, value in element.attributes.items()
+        if name == "xmlns" or name.startswith("xmlns:")
+    }
+
+
+def get_frame(root: Any) -> tuple[bytes, bytes, dict[str, str]]:
+    """Returns the XML before and after the children of the empty root
+    and the namespaces declared by the root.
+    """
+
+    document = root.toDOM()
+    namespaces = get_namespaces(document.documentElement)
+    document.documentElement.appendChild(document.createTextNode(SENTINEL))
+    head, tail = document.toxml(encoding=ENCODING).split(SENTINEL.encode())
+    return head, tail, namespaces
+
+
+def serialize(root: Any, namespaces: dict[str, str]) -> bytes:
+    """Returns the XML of the root's children.
+
+    Namespaces the root declares beyond those of the frame,
+    e.g. for xsi:nil or nested types, are declared on the children.
+    """
+
+    element = root.toDOM().documentElement
+    missing = {
+        name: value
+        for name, value in get_namespaces(element).items()
+        if namespaces.get(name) != value
+    }
+
+    for node in element.childNodes:
+        if node.nodeType != node.ELEMENT_NODE:
+            continue
+
+        for name, value in missing.items():
+            if not node.hasAttribute(name):
+                node.setAttribute(name, value)
+
+    return b"".join(node.toxml(encoding=ENCODING) for node in element.childNodes)
+
+
+def generate(
+    factory: Callable[[], Any], element: str, records: Iterable[Any]
+) -> Iterator[bytes]:
+    """Yields chunks of the XML document."""
+
+    head, tail, namespaces = get_frame(factory())
+    chunk = [head]
+    size = len(head)
+
+    for record in records:
+        getattr(root := factory(), element).append(record.to_dom())
+        chunk.append(xml := serialize(root, namespaces))
+
+        if (size := size + len(xml)) >= CHUNK_SIZE:
+            yield b"".join(chunk)
+            chunk.clear()
+            size = 0
+
+    chunk.append(tail)
+    yield b"".join(chunk)
+
+
+def stream_xml(
+    factory: Callable[[], Any], element: str, records: Iterable[Any]
+) -> Response:
+    """Returns a response streaming the records as XML.
+
+    The factory creates the empty root binding and element is the name of its
+    child list, as for appending the records' DOMs to a single document.
+    Only one record's DOM is held in memory at a time.
+    """
+
+    return Response(
+        stream_with_context(generate(factory, element, records)),
+        mimetype=MIMETYPE,
+    )
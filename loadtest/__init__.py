@@ -0,0 +1,7 @@
+"""Fleet simulation load tests.
+
+Boots the PRIVATE and PUBLIC applications against local stand-ins
+of their backends and simulates a fleet of polling systems:
+
+    python -m loadtest --systems 2000 --requests 50000
+"""
@@ -0,0 +1,58 @@
+"""Runs the fleet simulation."""
+
+from argparse import ArgumentParser, Namespace
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+from appcmd import PRIVATE, PUBLIC
+
+from loadtest.backends import HTTPOrigin, SMTPSink, install_stand_ins
+from loadtest.fixtures import bind, create_fleet
+from loadtest.simulation import run
+
+
+def get_args() -> Namespace:
+    """Parses the command line arguments."""
+
+    parser = ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "-s", "--systems", type=int, default=1000, help="amount of systems"
+    )
+    parser.add_argument(
+        "-r", "--requests", type=int, default=10000, help="amount of requests"
+    )
+    parser.add_argument(
+        "-t", "--threads", type=int, default=16, help="concurrent requests"
+    )
+    parser.add_argument("--seed", type=int, default=0, help="random seed")
+    return parser.parse_args()
+
+
+def main() -> None:
+    """Runs the simulation and prints the report."""
+
+    args = get_args()
+    sink = SMTPSink()
+    origin = HTTPOrigin()
+    sink.start()
+    origin.start()
+    install_stand_ins(sink)
+
+    with TemporaryDirectory() as directory:
+        database = bind(Path(directory))
+        fleet = create_fleet(args.systems, origin.url, seed=args.seed)
+        report = run(
+            {"PRIVATE": PRIVATE, "PUBLIC": PUBLIC},
+            fleet,
+            args.requests,
+            threads=args.threads,
+            seed=args.seed,
+        )
+        database.close()
+
+    print(report)
+    print(f"\n{sink.messages} emails received by the SMTP sink.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+"""Checks of the booking interval index.
+
+Checks the overlap and free slot computation of BookingIndex,
+which book() relies on to reject overlapping bookings:
+
+    python -m loadtest.availability
+"""
+
+from datetime import datetime, timedelta
+from sys import exit  # pylint: disable=W0622
+from typing import Any, Iterator
+
+from appcmd.availability import BookingIndex, Interval
+
+
+__all__ = ["check_index"]
+
+
+DAY = datetime(2030, 1, 1)
+
+
+def at(hour: float) -> datetime:
+    """Returns the datetime of the given hour of the day."""
+
+    return DAY + timedelta(hours=hour)
+
+
+def index(*hours: tuple[float, float]) -> BookingIndex:
+    """Returns an index of bookings from start to end hours."""
+
+    return BookingIndex(
+        sorted(
+            Interval(at(start), at(end), booking)
+            for booking, (start, end) in enumerate(hours, start=1)
+        )
+    )
+
+
+def hours(intervals: Iterator[Interval]) -> list[tuple[float, float]]:
+    """Returns the intervals as start and end hours."""
+
+    return [
+        (
+            (interval.start - DAY) / timedelta(hours=1),
+            (interval.end - DAY) / timedelta(hours=1),
+        )
+        for interval in intervals
+    ]
+
+
+CHECKS: list[tuple[str, Any, Any]] = [
+    ("empty: no overlaps", lambda: hours(index().overlapping(at(8), at(18))), []),
+    ("empty: all free", lambda: hours(index().free(at(8), at(18))), [(8, 18)]),
+    ("empty: no conflict", lambda: index().conflicts(at(8), at(9)), False),
+    (
+        "booking starting before the range overlaps",
+        lambda: hours(index((6, 9), (12, 13)).overlapping(at(8), at(18))),
+        [(6, 9), (12, 13)],
+    ),
+    (
+        "booking starting before the range is clipped from free slots",
+        lambda: hours(index((6, 9), (12, 13)).free(at(8), at(18))),
+        [(9, 12), (13, 18)],
+    ),
+    (
+        "booking ending at the range start does not overlap",
+        lambda: hours(index((6, 8), (12, 13)).overlapping(at(8), at(18))),
+        [(12, 13)],
+    ),
+    (
+        "booking starting at the range end does not overlap",
+        lambda: hours(index((18, 19)).overlapping(at(8), at(18))),
+        [],
+    ),
+    (
+        "adjacent bookings leave no gap",
+        lambda: hours(index((9, 10), (10, 11)).free(at(8), at(12))),
+        [(8, 9), (11, 12)],
+    ),
+    (
+        "adjacent booking does not conflict",
+        lambda: index((9, 10), (11, 12)).conflicts(at(10), at(11)),
+        False,
+    ),
+    (
+        "overlapping booking conflicts",
+        lambda: index((9, 10), (11, 12)).conflicts(at(10), at(11.5)),
+        True,
+    ),
+    (
+        "range within a booking conflicts",
+        lambda: index((9, 12)).conflicts(at(10), at(11)),
+        True,
+    ),
+    (
+        "range covered by one booking has no free slots",
+        lambda: hours(index((7, 19)).free(at(8), at(18))),
+        [],
+    ),
+    (
+        "range covered by adjacent bookings has no free slots",
+        lambda: hours(index((7, 12), (12, 19)).free(at(8), at(18))),
+        [],
+    ),
+    (
+        "range covered exactly has no free slots",
+        lambda: hours(index((8, 18)).free(at(8), at(18))),
+        [],
+    ),
+]
+
+
+def check_index() -> Iterator[str]:
+    """Yields failed checks."""
+
+    for name, check, expected in CHECKS:
+        if (actual := check()) != expected:
+            yield f"{name}: expected {expected}, got {actual}."
+
+
+def main() -> None:
+    """Runs the checks."""
+
+    failures = list(check_index())
+
+    for failure in failures:
+        print(failure)
+
+    exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
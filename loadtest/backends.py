@@ -0,0 +1,187 @@
+"""Local stand-ins for external services."""
+
+from configparser import ConfigParser
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from smtplib import SMTP
+from sys import modules
+from socketserver import StreamRequestHandler, ThreadingTCPServer
+from threading import Thread
+from time import sleep
+from typing import Iterable
+
+from wsgilib import JSON
+
+
+__all__ = [
+    "SMTPSink",
+    "HTTPOrigin",
+    "SinkMailer",
+    "get_config",
+    "install_stand_ins",
+    "lpt_response",
+    "aha_response",
+]
+
+
+LPT_LATENCY = 0.05
+AHA_LATENCY = 0.05
+
+
+class SMTPSinkHandler(StreamRequestHandler):
+    """Accepts and discards SMTP transactions."""
+
+    def reply(self, line: str) -> None:
+        """Sends a reply line."""
+        self.wfile.write(f"{line}\r\n".encode())
+
+    def handle(self) -> None:
+        """Handles an SMTP session."""
+        self.reply("220 localhost SMTP sink")
+
+        while line := self.rfile.readline():
+            command = line.decode(errors="replace").strip().upper()
+
+            if command.startswith(("EHLO", "HELO")):
+                self.reply("250 localhost")
+            elif command == "DATA":
+                self.reply("354 End data with <CR><LF>.<CR><LF>")
+
+                while self.rfile.readline() not in {b".\r\n", b".\n", b""}:
+                    pass
+
+                self.server.messages += 1
+                self.reply("250 OK")
+            elif command.startswith("QUIT"):
+                self.reply("221 Bye")
+                return
+            else:
+                self.reply("250 OK")
+
+
+class SMTPSink(ThreadingTCPServer):
+    """A local SMTP server counting received messages."""
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0):
+        super().__init__((host, port), SMTPSinkHandler)
+        self.messages = 0
+
+    def start(self) -> None:
+        """Serves in a background thread."""
+        Thread(target=self.serve_forever, daemon=True).start()
+
+
+class HTTPOriginHandler(BaseHTTPRequestHandler):
+    """Serves a static page."""
+
+    BODY = b"<html><body>" + b"Lorem ipsum dolor sit amet. " * 256 + b"</body></html>"
+
+    def do_GET(self) -> None:  # pylint: disable=C0103
+        """Returns the static page."""
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html")
+        self.send_header("Content-Length", str(len(self.BODY)))
+        self.end_headers()
+        self.wfile.write(self.BODY)
+
+    def log_message(self, *_) -> None:
+        """Suppresses request logging."""
+
+
+class HTTPOrigin(ThreadingHTTPServer):
+    """A local origin for the proxy."""
+
+    daemon_threads = True
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0):
+        super().__init__((host, port), HTTPOriginHandler)
+
+    @property
+    def url(self) -> str:
+        """Returns the URL of the page."""
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/page.html"
+
+    def start(self) -> None:
+        """Serves in a background thread."""
+        Thread(target=self.serve_forever, daemon=True).start()
+
+
+class SinkMailer:
+    """Delivers emails to the SMTP sink."""
+
+    def __init__(self, sink: SMTPSink):
+        self.host, self.port = sink.server_address[:2]
+
+    def send(self, emails: Iterable) -> bool:
+        """Sends the given emails."""
+        with SMTP(self.host, self.port) as smtp:
+            for email in emails:
+                smtp.send_message(email)
+
+        return True
+
+    def send_record(self, record) -> None:
+        """Stand-in for the record notification functions of the backends."""
+        with SMTP(self.host, self.port) as smtp:
+            smtp.sendmail(
+                "appcmd@localhost", ["landlord@localhost"], f"Subject: {record!r}\r\n"
+            )
+
+
+def get_config(sink: SMTPSink, **sections: dict[str, str]) -> ConfigParser:
+    """Returns the configuration for the simulation with additional sections."""
+
+    config = ConfigParser()
+    host, port = sink.server_address[:2]
+    config.read_dict(
+        {
+            "EMail": {
+                "host": host,
+                "port": str(port),
+                "user": "appcmd",
+                "passwd": "appcmd",
+                "subject": "Kontaktformular",
+                "sender": "appcmd@localhost",
+            }
+        }
+    )
+    config.read_dict(sections)
+    return config
+
+
+def lpt_response(address, **_) -> JSON:
+    """Stand-in for the local public transport upstream."""
+
+    sleep(LPT_LATENCY)
+    return JSON({"stops": [{"name": str(address), "departures": []}]})
+
+
+def aha_response(address) -> JSON:
+    """Stand-in for the garbage pickup upstream."""
+
+    sleep(AHA_LATENCY)
+    return JSON([{"address": str(address), "type": "Restabfall", "pickups": []}])
+
+
+def install_stand_ins(sink: SMTPSink, **sections: dict[str, str]) -> None:
+    """Replaces configuration, mailers and upstreams with local stand-ins."""
+
+    config = get_config(sink, **sections)
+    mailer = SinkMailer(sink)
+
+    for name, module in list(modules.items()):
+        if name != "appcmd" and not name.startswith("appcmd."):
+            continue
+
+        if hasattr(module, "get_config"):
+            module.get_config = lambda config=config: config
+
+        if hasattr(module, "email") and callable(module.email):
+            module.email = mailer.send_record
+
+    modules["appcmd.mail"].get_mailer = lambda: mailer
+    modules["appcmd.lpt"].get_response = lpt_response
+    modules["appcmd.garbage_pickup"].by_address = aha_response
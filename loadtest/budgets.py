@@ -0,0 +1,218 @@
+"""Per-route SQL query budgets.
+
+Runs every route of PRIVATE_ROUTES and PUBLIC_ROUTES once against
+the fixtures and fails if a route does not respond with the expected
+status, i.e. 2xx by default, or issues more SQL statements than its
+budget allows, listing the offending statements:
+
+    python -m loadtest.budgets
+"""
+
+from datetime import datetime, timedelta
+from json import dumps
+from pathlib import Path
+from random import Random
+from sys import exit  # pylint: disable=W0622
+from tempfile import TemporaryDirectory
+from typing import Iterator, NamedTuple
+
+from flask import Flask
+
+from cmslib import Poll, PollOption
+
+from appcmd import PRIVATE, PUBLIC
+from appcmd.wsgi import PRIVATE_ROUTES, PUBLIC_ROUTES
+
+from loadtest.backends import HTTPOrigin, SMTPSink, install_stand_ins
+from loadtest.fixtures import Fleet, bind, create_fleet, make
+from loadtest.queries import Statement, recorded_queries
+from loadtest.simulation import MIX, Request
+
+
+__all__ = ["BUDGETS", "Violation", "check_budgets"]
+
+
+# Maximum amount of SQL statements per route on a cold worker.
+BUDGETS = {
+    ("PRIVATE", "GET", "/bookables"): 2,
+    ("PRIVATE", "GET", "/bookables/<int:ident>/availability"): 3,
+    ("PRIVATE", "GET", "/bookings"): 2,
+    ("PRIVATE", "POST", "/bookings"): 6,
+    ("PRIVATE", "DELETE", "/bookings/<int:ident>"): 3,
+    ("PRIVATE", "GET", "/cleaning"): 2,
+    ("PRIVATE", "GET", "/deployment"): 1,
+    ("PRIVATE", "GET", "/garbage-pickup"): 1,
+    ("PRIVATE", "GET", "/lpt"): 1,
+    ("PRIVATE", "GET", "/online-check"): 0,
+    ("PRIVATE", "GET", "/tenantcalendar"): 2,
+    ("PRIVATE", "POST", "/cleaning"): 4,
+    ("PRIVATE", "POST", "/contactform"): 0,
+    ("PRIVATE", "POST", "/damagereport"): 2,
+    ("PRIVATE", "POST", "/poll"): 4,
+    ("PRIVATE", "POST", "/proxy"): 1,
+    ("PRIVATE", "POST", "/statistics"): 2,
+    ("PRIVATE", "POST", "/tenant2landlord"): 2,
+    ("PRIVATE", "POST", "/tenant2tenant"): 3,
+    ("PUBLIC", "POST", "/proxy"): 1,
+    ("PUBLIC", "GET", "/online-check"): 0,
+}
+# Expected HTTP status codes of routes not answering with 2xx.
+STATUSES: dict[tuple[str, str, str], set[int]] = {}
+ROUTES = {"PRIVATE": PRIVATE_ROUTES, "PUBLIC": PUBLIC_ROUTES}
+
+
+class Violation(NamedTuple):
+    """A route that exceeded its query budget or failed."""
+
+    application: str
+    method: str
+    route: str
+    message: str
+    statements: list[Statement] = []
+
+    def __str__(self) -> str:
+        """Returns the violation with the offending statements."""
+        lines = [f"{self.application} {self.method} {self.route}: {self.message}"]
+        lines.extend(f"    {statement}" for statement in self.statements)
+        return "\n".join(lines)
+
+
+def cast_vote(fleet: Fleet) -> Request:
+    """Returns a request voting for an option of an active poll."""
+
+    base = make(Poll.base.rel_model, active=True)
+    poll = make(Poll, base=base)
+    choices = [make(PollOption, poll=poll).id]
+    return Request(
+        "PRIVATE",
+        "POST",
+        "/poll",
+        "/poll",
+        str(fleet.screens[0].ip_address),
+        dumps({"poll": poll.id, "choices": choices}).encode(),
+    )
+
+
+def book(fleet: Fleet) -> Request:
+    """Returns a request booking a bookable beyond the fixture bookings."""
+
+    start = datetime.now().replace(microsecond=0) + timedelta(days=365)
+    data = {
+        "bookable": fleet.screens[0].bookables[0],
+        "start": start.isoformat(),
+        "end": (start + timedelta(minutes=30)).isoformat(),
+    }
+    return Request(
+        "PRIVATE",
+        "POST",
+        "/bookings",
+        "/bookings",
+        str(fleet.screens[0].ip_address),
+        dumps(data).encode(),
+    )
+
+
+def add_cleaning(fleet: Fleet) -> Request:
+    """Returns a request adding a cleaning with a valid PIN."""
+
+    return Request(
+        "PRIVATE",
+        "POST",
+        "/cleaning",
+        f"/cleaning?pin={fleet.screens[0].pins[0]}",
+        str(fleet.screens[0].ip_address),
+        b"{}",
+    )
+
+
+def get_requests(fleet: Fleet) -> dict[tuple[str, str, str], Request]:
+    """Returns a request for each route."""
+
+    random = Random(0)
+    requests = {}
+
+    for factory, _ in MIX:
+        request = factory(fleet.screens[0], fleet, random)
+        requests[(request.application, request.method, request.route)] = request
+
+    requests[("PRIVATE", "POST", "/bookings")] = book(fleet)
+    requests[("PRIVATE", "POST", "/cleaning")] = add_cleaning(fleet)
+    requests[("PRIVATE", "POST", "/poll")] = cast_vote(fleet)
+    return requests
+
+
+def measure(application: Flask, request: Request) -> tuple[int, list[Statement]]:
+    """Returns the status and statements of the request."""
+
+    with recorded_queries() as statements:
+        response = application.test_client().open(
+            request.path,
+            method=request.method,
+            data=request.data,
+            environ_base={"REMOTE_ADDR": request.ip_address},
+        )
+        response.get_data()
+
+    return response.status_code, statements
+
+
+def is_expected(key: tuple[str, str, str], status: int) -> bool:
+    """Checks whether the status is expected for the route."""
+
+    if (statuses := STATUSES.get(key)) is not None:
+        return status in statuses
+
+    return 200 <= status < 300
+
+
+def check_budgets(fleet: Fleet) -> Iterator[Violation]:
+    """Yields routes exceeding their budgets or failing unexpectedly."""
+
+    requests = get_requests(fleet)
+    applications = {"PRIVATE": PRIVATE, "PUBLIC": PUBLIC}
+
+    for name, routes in ROUTES.items():
+        for method, route, _ in routes:
+            key = (name, method, route)
+
+            if (budget := BUDGETS.get(key)) is None:
+                yield Violation(name, method, route, "No query budget declared.")
+                continue
+
+            if (request := requests.get(key)) is None:
+                yield Violation(name, method, route, "No request defined.")
+                continue
+
+            status, statements = measure(applications[name], request)
+
+            if not is_expected(key, status):
+                message = f"Unexpected HTTP {status}."
+                yield Violation(name, method, route, message, statements)
+                continue
+
+            if len(statements) > budget:
+                message = f"{len(statements)} queries exceed budget of {budget}."
+                yield Violation(name, method, route, message, statements)
+
+
+def main() -> None:
+    """Checks the query budgets of all routes."""
+
+    sink = SMTPSink()
+    origin = HTTPOrigin()
+    sink.start()
+    origin.start()
+    install_stand_ins(sink)
+
+    with TemporaryDirectory() as directory:
+        bind(Path(directory))
+        violations = list(check_budgets(create_fleet(1, origin.url)))
+
+    for violation in violations:
+        print(violation)
+
+    exit(1 if violations else 0)
+
+
+if __name__ == "__main__":
+    main()
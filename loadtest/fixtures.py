@@ -0,0 +1,178 @@
+"""SQLite-backed fixtures for the hwdb, mdb, digsigdb and service models."""
+
+from datetime import date, datetime, time, timedelta
+from ipaddress import IPv4Address
+from itertools import count
+from pathlib import Path
+from random import Random
+from typing import Any, Iterable, NamedTuple
+from uuid import uuid4
+
+from peewee import AutoField, ForeignKeyField, Field, Model
+
+from bookings import Bookable, Booking
+from cleaninglog import CleaningUser
+from digsigdb import ProxyHost
+from hwdb import Deployment, OpenVPN, System
+from mdb import Customer
+
+from loadtest.queries import CountingDatabase
+
+
+__all__ = ["Fleet", "Screen", "get_models", "bind", "make", "create_fleet"]
+
+
+VPN_NETWORK = IPv4Address("10.8.0.0")
+SERIAL = count(1)
+
+
+class Screen(NamedTuple):
+    """A simulated system."""
+
+    ip_address: IPv4Address
+    system: System
+    customer: Customer
+    pins: list[str]
+    bookables: list[int]
+    bookings: list[int]
+
+
+class Fleet(NamedTuple):
+    """The simulated systems and the origin URL for the proxy."""
+
+    screens: list[Screen]
+    proxy_url: str
+
+
+def get_models(base: type = Model) -> Iterable[type]:
+    """Yields all imported concrete models."""
+
+    for model in base.__subclasses__():
+        if not getattr(model._meta, "abstract", False):
+            yield model
+
+        yield from get_models(model)
+
+
+def bind(directory: Path) -> CountingDatabase:
+    """Binds all models to SQLite databases within the given directory.
+
+    Models with a schema are placed in a separately
+    attached database file named after the schema.
+    """
+
+    database = CountingDatabase(
+        str(directory / "main.db"),
+        pragmas={"journal_mode": "wal", "synchronous": "off"},
+        timeout=30,
+    )
+    models = list(dict.fromkeys(get_models()))
+
+    for schema in {model._meta.schema for model in models} - {None}:
+        database.attach(str(directory / f"{schema}.db"), schema)
+
+    database.bind(models, bind_refs=False, bind_backrefs=False)
+    database.create_tables(models, safe=True)
+    return database
+
+
+def dummy(field: Field) -> Any:
+    """Returns a dummy value for the given field."""
+
+    if isinstance(field, ForeignKeyField):
+        return make(field.rel_model)
+
+    if (enum := getattr(field, "enum", None)) is not None:
+        return next(iter(enum))
+
+    serial = next(SERIAL)
+    field_type = str(field.field_type).upper()
+
+    if field_type in {"INT", "BIGINT", "SMALLINT", "INTEGER"}:
+        return serial
+
+    if field_type in {"FLOAT", "DOUBLE", "DECIMAL", "REAL"}:
+        return float(serial)
+
+    if field_type in {"BOOL", "BOOLEAN"}:
+        return False
+
+    if field_type == "DATETIME":
+        return datetime.now()
+
+    if field_type == "DATE":
+        return date.today()
+
+    if field_type == "TIME":
+        return time()
+
+    if field_type in {"BLOB", "BINARY"}:
+        return b""
+
+    if field_type == "UUID":
+        return uuid4()
+
+    return f"{field.name}-{serial}"[: getattr(field, "max_length", None)]
+
+
+def make(model: type, **values: Any) -> Model:
+    """Creates a record, filling in dummy values for mandatory fields."""
+
+    for field in model._meta.sorted_fields:
+        if field.name in values or isinstance(field, AutoField):
+            continue
+
+        if field.null or field.default is not None:
+            continue
+
+        values[field.name] = dummy(field)
+
+    return model.create(**values)
+
+
+def create_fleet(
+    systems: int,
+    proxy_url: str,
+    *,
+    systems_per_customer: int = 50,
+    seed: int = 0,
+) -> Fleet:
+    """Creates the records of the simulated fleet."""
+
+    random = Random(seed)
+    make(ProxyHost, hostname="127.0.0.1")
+    screens = []
+    now = datetime.now().replace(minute=0, second=0, microsecond=0)
+
+    for index in range(systems):
+        if index % systems_per_customer == 0:
+            customer = make(Customer)
+            pins = [f"{random.randrange(10**6):06d}" for _ in range(20)]
+
+            for pin in pins:
+                make(CleaningUser, customer=customer, pin=pin)
+
+            bookables, bookings = [], []
+
+            for _ in range(3):
+                bookables.append((bookable := make(Bookable, customer=customer)).id)
+
+                for day in range(30):
+                    start = now + timedelta(days=day, hours=random.randrange(8, 18))
+                    booking = make(
+                        Booking,
+                        bookable=bookable,
+                        start=start,
+                        end=start + timedelta(hours=1),
+                    )
+                    bookings.append(booking.id)
+
+        ip_address = VPN_NETWORK + 2 + index
+        deployment = make(Deployment, customer=customer)
+        openvpn = make(OpenVPN, ipv4address=ip_address)
+        system = make(System, openvpn=openvpn, deployment=deployment)
+        screens.append(
+            Screen(ip_address, system, customer, pins, bookables, bookings)
+        )
+
+    return Fleet(screens, proxy_url)
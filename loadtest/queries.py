@@ -0,0 +1,49 @@
+"""Counting of SQL statements."""
+
+from contextlib import contextmanager
+from threading import local
+from typing import Any, Iterator, NamedTuple
+
+from peewee import SqliteDatabase
+
+
+__all__ = ["Statement", "CountingDatabase", "recorded_queries"]
+
+
+RECORDERS = local()
+
+
+class Statement(NamedTuple):
+    """An executed SQL statement."""
+
+    database: str
+    sql: str
+    params: Any
+
+    def __str__(self) -> str:
+        """Returns the statement with its parameters."""
+        return f"{self.sql} {self.params}"
+
+
+class CountingDatabase(SqliteDatabase):
+    """An SQLite database that records the statements it executes."""
+
+    def execute_sql(self, sql, params=None, *args, **kwargs):
+        """Records the statement and executes it."""
+        if (statements := getattr(RECORDERS, "statements", None)) is not None:
+            statements.append(Statement(self.database, sql, params))
+
+        return super().execute_sql(sql, params, *args, **kwargs)
+
+
+@contextmanager
+def recorded_queries() -> Iterator[list[Statement]]:
+    """Records the statements executed by the current thread."""
+
+    previous = getattr(RECORDERS, "statements", None)
+    RECORDERS.statements = statements = []
+
+    try:
+        yield statements
+    finally:
+        RECORDERS.statements = previous
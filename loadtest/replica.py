@@ -0,0 +1,121 @@
+"""Checks of the read replica routing.
+
+Copies the fixture databases to a second directory, which serves as the
+read replica, and checks that GET requests are routed to it, that writes
+of data read back pin the system to the primary, while other writes do
+not, and that an unavailable replica falls back to the primary:
+
+    python -m loadtest.replica
+"""
+
+from pathlib import Path
+from shutil import copy2
+from sys import exit  # pylint: disable=W0622
+from tempfile import TemporaryDirectory
+from time import monotonic
+from typing import Iterator
+
+from appcmd import PRIVATE
+from appcmd.replica import ROUTERS, pooled
+
+from loadtest.backends import HTTPOrigin, SMTPSink, install_stand_ins
+from loadtest.budgets import add_cleaning, measure
+from loadtest.fixtures import Fleet, bind, create_fleet
+from loadtest.simulation import Request
+
+
+__all__ = ["check_replica"]
+
+
+def get(fleet: Fleet, screen: int, path: str) -> Request:
+    """Returns a GET request of the given screen."""
+
+    return Request(
+        "PRIVATE", "GET", path, path, str(fleet.screens[screen].ip_address)
+    )
+
+
+def check(
+    name: str, request: Request, database: str, status: int = 200
+) -> Iterator[str]:
+    """Performs the request and checks the database of all its statements."""
+
+    actual, statements = measure(PRIVATE, request)
+
+    if actual != status:
+        yield f"{name}: expected HTTP {status}, got {actual}."
+
+    if not statements:
+        yield f"{name}: no statements executed."
+
+    for statement in statements:
+        if statement.database != database:
+            yield f"{name}: executed on {statement.database}: {statement}"
+
+
+def check_replica(fleet: Fleet, primary: str, replica: str) -> Iterator[str]:
+    """Yields failures of the replica routing."""
+
+    yield from check("Read", get(fleet, 0, "/bookables"), replica)
+    statistics = Request(
+        "PRIVATE",
+        "POST",
+        "/statistics",
+        "/statistics",
+        str(fleet.screens[1].ip_address),
+        b"<statistics/>",
+    )
+    yield from check("Write not read back", statistics, primary, 201)
+    yield from check("Read after statistics", get(fleet, 1, "/bookings"), replica)
+    yield from check("Write", add_cleaning(fleet), primary, 201)
+    yield from check("Read your writes", get(fleet, 0, "/cleaning"), primary)
+    yield from check("Read of other system", get(fleet, 1, "/bookings"), replica)
+
+    if not ROUTERS:
+        yield "No database routers installed."
+        return
+
+    missing = str(Path(replica).parent / "missing" / "main.db")
+
+    for router in ROUTERS:
+        router.replica = pooled(router.primary, missing)
+
+    yield from check("Fallback", get(fleet, 1, "/bookings"), primary)
+
+    if all(router.replica_down_until <= monotonic() for router in ROUTERS):
+        yield "Fallback: unavailable replica not marked as down."
+
+
+def main() -> None:
+    """Checks the replica routing."""
+
+    sink = SMTPSink()
+    origin = HTTPOrigin()
+    sink.start()
+    origin.start()
+
+    with TemporaryDirectory() as primary, TemporaryDirectory() as replica:
+        database = bind(Path(primary))
+        fleet = create_fleet(2, origin.url)
+        database.close()
+
+        for file in Path(primary).glob("*.db*"):
+            copy2(file, Path(replica) / file.name)
+
+        install_stand_ins(
+            sink, Database={"replica_database": str(Path(replica) / "main.db")}
+        )
+        failures = list(
+            check_replica(
+                fleet, str(Path(primary) / "main.db"), str(Path(replica) / "main.db")
+            )
+        )
+
+    for failure in failures:
+        print(failure)
+
+    exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
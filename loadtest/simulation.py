@@ -0,0 +1,300 @@
+"""Simulation of polling systems."""
+
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from json import dumps
+from math import ceil
+from random import Random
+from threading import local
+from time import perf_counter
+from typing import Callable, Iterator, NamedTuple, Optional
+
+from flask import Flask
+from flask.testing import FlaskClient
+
+from loadtest.fixtures import Fleet, Screen
+from loadtest.queries import recorded_queries
+
+
+__all__ = ["MIX", "Request", "Result", "Report", "requests", "run"]
+
+
+class Request(NamedTuple):
+    """A request of a simulated system."""
+
+    application: str
+    method: str
+    route: str
+    path: str
+    ip_address: str
+    data: bytes = b""
+
+
+class Result(NamedTuple):
+    """The outcome of a request."""
+
+    route: str
+    status: int
+    seconds: float
+    queries: int
+
+
+Factory = Callable[[Screen, Fleet, Random], Request]
+
+
+def private(
+    method: str, route: str, path: Optional[str] = None, data: bytes = b""
+) -> Factory:
+    """Returns a factory for a plain request to the private application."""
+
+    return lambda screen, _, __: Request(
+        "PRIVATE", method, route, path or route, str(screen.ip_address), data
+    )
+
+
+def book(screen: Screen, _: Fleet, random: Random) -> Request:
+    """Books a random bookable at a random time."""
+
+    start = datetime.now() + timedelta(days=random.randrange(60), hours=8)
+    data = {
+        "bookable": random.choice(screen.bookables),
+        "start": start.isoformat(),
+        "end": (start + timedelta(minutes=30)).isoformat(),
+        "rentee": "Max Mustermann",
+    }
+    return Request(
+        "PRIVATE",
+        "POST",
+        "/bookings",
+        "/bookings",
+        str(screen.ip_address),
+        dumps(data).encode(),
+    )
+
+
+def availability(screen: Screen, _: Fleet, random: Random) -> Request:
+    """Queries the availability of a random bookable."""
+
+    ident = random.choice(screen.bookables)
+    return Request(
+        "PRIVATE",
+        "GET",
+        "/bookables/<int:ident>/availability",
+        f"/bookables/{ident}/availability",
+        str(screen.ip_address),
+    )
+
+
+def cancel(screen: Screen, _: Fleet, random: Random) -> Request:
+    """Cancels a random booking."""
+
+    ident = random.choice(screen.bookings)
+    return Request(
+        "PRIVATE",
+        "DELETE",
+        "/bookings/<int:ident>",
+        f"/bookings/{ident}",
+        str(screen.ip_address),
+    )
+
+
+def add_cleaning(screen: Screen, _: Fleet, random: Random) -> Request:
+    """Submits a cleaning with a mostly valid PIN."""
+
+    pin = random.choice(screen.pins) if random.random() < 0.95 else "000000"
+    return Request(
+        "PRIVATE",
+        "POST",
+        "/cleaning",
+        f"/cleaning?pin={pin}",
+        str(screen.ip_address),
+        dumps({"annotations": ["Treppenhaus"]}).encode(),
+    )
+
+
+def private_proxy(screen: Screen, fleet: Fleet, _: Random) -> Request:
+    """Fetches the origin via the private proxy."""
+
+    return Request(
+        "PRIVATE",
+        "POST",
+        "/proxy",
+        "/proxy",
+        str(screen.ip_address),
+        fleet.proxy_url.encode(),
+    )
+
+
+def public_proxy(_: Screen, fleet: Fleet, random: Random) -> Request:
+    """Fetches the origin via the public proxy from a public address."""
+
+    return Request(
+        "PUBLIC",
+        "POST",
+        "/proxy",
+        "/proxy",
+        f"192.0.2.{random.randrange(1, 255)}",
+        fleet.proxy_url.encode(),
+    )
+
+
+def contact_form(screen: Screen, _: Fleet, __: Random) -> Request:
+    """Sends a contact form."""
+
+    data = {
+        "empfaenger": "landlord@localhost",
+        "name": "Max Mustermann",
+        "freitext": "Bitte um Rückruf.",
+        "rueckruf": True,
+    }
+    return Request(
+        "PRIVATE",
+        "POST",
+        "/contactform",
+        "/contactform",
+        str(screen.ip_address),
+        dumps(data).encode(),
+    )
+
+
+# Relative weights of a system's requests during regular operation.
+MIX: list[tuple[Factory, int]] = [
+    (private("GET", "/online-check"), 300),
+    (private("POST", "/statistics", data=b"<statistics/>"), 250),
+    (private("GET", "/lpt"), 100),
+    (private("GET", "/deployment"), 60),
+    (private("GET", "/bookings"), 60),
+    (private("GET", "/bookables"), 30),
+    (availability, 30),
+    (private("GET", "/tenantcalendar"), 40),
+    (private("GET", "/garbage-pickup"), 30),
+    (private("GET", "/cleaning"), 20),
+    (private_proxy, 20),
+    (public_proxy, 20),
+    (add_cleaning, 10),
+    (book, 5),
+    (cancel, 2),
+    (private("POST", "/damagereport", data=b'{"message": "Licht defekt"}'), 2),
+    (private("POST", "/tenant2tenant", data="Flohmarkt am Samstag.".encode()), 2),
+    (private("POST", "/tenant2landlord", data="Heizung kalt.".encode()), 2),
+    (contact_form, 1),
+]
+
+
+def requests(fleet: Fleet, amount: int, *, seed: int = 0) -> Iterator[Request]:
+    """Yields requests of randomly chosen systems following the mix."""
+
+    random = Random(seed)
+    factories, weights = zip(*MIX)
+
+    for _ in range(amount):
+        screen = random.choice(fleet.screens)
+        factory = random.choices(factories, weights)[0]
+        yield factory(screen, fleet, random)
+
+
+@dataclass
+class Report:
+    """Statistics of a simulation run."""
+
+    seconds: float = 0
+    results: dict[str, list[Result]] = field(default_factory=lambda: defaultdict(list))
+
+    def add(self, result: Result) -> None:
+        """Adds a result."""
+        self.results[result.route].append(result)
+
+    def __str__(self) -> str:
+        """Returns a text table."""
+        total = sum(len(results) for results in self.results.values())
+        lines = [
+            f"{total} requests in {self.seconds:.1f} s "
+            f"({total / self.seconds:.1f} req/s)",
+            "",
+            f"{'route':<32}{'req/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}"
+            f"{'queries':>9}  statuses",
+        ]
+
+        for route, results in sorted(self.results.items()):
+            seconds = sorted(result.seconds for result in results)
+            statuses = defaultdict(int)
+
+            for result in results:
+                statuses[result.status] += 1
+
+            lines.append(
+                f"{route:<32}"
+                f"{len(results) / self.seconds:>9.1f}"
+                f"{percentile(seconds, 50) * 1000:>9.1f}"
+                f"{percentile(seconds, 95) * 1000:>9.1f}"
+                f"{percentile(seconds, 99) * 1000:>9.1f}"
+                f"{sum(result.queries for result in results) / len(results):>9.1f}"
+                f"  {dict(sorted(statuses.items()))}"
+            )
+
+        return "\n".join(lines)
+
+
+def percentile(values: list[float], percent: int) -> float:
+    """Returns the respective percentile of the sorted values."""
+
+    return values[max(0, ceil(len(values) * percent / 100) - 1)]
+
+
+def run(
+    applications: dict[str, Flask],
+    fleet: Fleet,
+    amount: int,
+    *,
+    threads: int = 16,
+    seed: int = 0,
+) -> Report:
+    """Runs the simulation."""
+
+    clients = local()
+
+    def perform(request: Request) -> Result:
+        if (client := getattr(clients, request.application, None)) is None:
+            client = applications[request.application].test_client()
+            setattr(clients, request.application, client)
+
+        return execute(client, request)
+
+    report = Report()
+    start = perf_counter()
+
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        for result in executor.map(perform, requests(fleet, amount, seed=seed)):
+            report.add(result)
+
+    report.seconds = perf_counter() - start
+    return report
+
+
+def execute(client: FlaskClient, request: Request) -> Result:
+    """Executes a request and measures its duration and queries."""
+
+    with recorded_queries() as statements:
+        start = perf_counter()
+        response = client.open(
+            request.path,
+            method=request.method,
+            data=request.data,
+            environ_base={"REMOTE_ADDR": request.ip_address},
+        )
+        response.get_data()
+        seconds = perf_counter() - start
+
+    label = f"{request.method} {request.route}"
+
+    if request.application == "PUBLIC":
+        label += " (public)"
+
+    return Result(
+        label,
+        response.status_code,
+        seconds,
+        len(statements),
+    )